@@ -7,17 +7,33 @@ Enhanced DappLooker Two-Step API Fetcher
 - Duplicate prevention using token IDs
 - Automatic Irys upload with DappLooker tags and date
 - 4-day file retention with auto-cleanup
-- Comprehensive logging and monitoring
+- Comprehensive logging and monitoring (queued, rotated, configurable verbosity)
+- Optional sharding of the token universe across processes/machines
+- Optional daemon mode with tiered refresh by token activity
+- Optional on-disk response cache for fast reruns and offline replay
 """
 
+import argparse
+import atexit
 import csv
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
+import sys
 import time
 import logging
 import os
+import queue
+import re
+import schedule
+import shutil
+import signal
 import subprocess
 import glob
+import gzip
+import json
 from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -28,6 +44,10 @@ API_KEY = "0de6af685d0d40e2852ead2d67210442"
 METAINFO_URL = "https://api.dapplooker.com/v1/crypto-metainfo"
 MARKET_URL = "https://api.dapplooker.com/v1/crypto-market/"
 
+# Shared HTTP session - keeps connections warm between requests (and daemon cycles)
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=10))
+
 # Irys Configuration
 IRYS_NODE = os.getenv('IRYS_NODE', 'https://uploader.irys.xyz')
 IRYS_TOKEN = os.getenv('IRYS_TOKEN', 'ethereum')
@@ -37,17 +57,299 @@ UPLOAD_ENABLED = os.getenv('UPLOAD_ENABLED', 'true').lower() == 'true'
 # File retention settings
 RETENTION_DAYS = 4
 
+# Chains to process (order also defines row order in merged output)
+CHAINS = ['base', 'solana']
+
+# Sharding settings
+SHARD_DIR = os.getenv('SHARD_DIR', 'shards')
+
+# Daemon settings - tiers are ranked by volume_24h, then mcap, from the last snapshot
+# Tier sizes are derived from DAEMON_REQUEST_BUDGET unless DAEMON_HOT_SIZE/DAEMON_WARM_SIZE are set
+DAEMON_REQUEST_BUDGET = int(os.getenv('DAEMON_REQUEST_BUDGET', '0'))  # API requests/day, 0 = same as one daily run
+DAEMON_HOT_SIZE = os.getenv('DAEMON_HOT_SIZE')    # Optional fixed size, must fit the budget
+DAEMON_WARM_SIZE = os.getenv('DAEMON_WARM_SIZE')  # Optional fixed size, must fit the budget
+DAEMON_HOT_SHARE = float(os.getenv('DAEMON_HOT_SHARE', '0.5'))  # Share of spare budget offered to hot tokens first
+DAEMON_HOT_MINUTES = int(os.getenv('DAEMON_HOT_MINUTES', '15'))
+DAEMON_WARM_MINUTES = int(os.getenv('DAEMON_WARM_MINUTES', '180'))
+DAEMON_COLD_MINUTES = int(os.getenv('DAEMON_COLD_MINUTES', '2880'))  # Long tail every 2 days frees budget for hot/warm
+DAEMON_CATALOG_MINUTES = int(os.getenv('DAEMON_CATALOG_MINUTES', '1440'))
+DAEMON_SNAPSHOT_MINUTES = int(os.getenv('DAEMON_SNAPSHOT_MINUTES', '60'))
+DAEMON_UPLOAD_MINUTES = int(os.getenv('DAEMON_UPLOAD_MINUTES', '1440'))  # Irys upload of a snapshot, 0 = never
+DAEMON_SLICE_SECONDS = int(os.getenv('DAEMON_SLICE_SECONDS', '60'))  # Warm/cold work between hot checks
+DAEMON_SLICE_TOKENS = int(os.getenv('DAEMON_SLICE_TOKENS', '60'))
+
+# Response cache settings (opt-in)
+CACHE_MODE = os.getenv('CACHE_MODE', 'off').lower()  # 'off', 'on' (read/write with TTL) or 'replay' (cache only)
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join('.cache', 'responses'))
+CACHE_TTL_HOURS = float(os.getenv('CACHE_TTL_HOURS', '24'))
+CACHE_MAX_MB = float(os.getenv('CACHE_MAX_MB', '200'))
+
+# Logging settings
+LOG_FILE = os.getenv('LOG_FILE', 'enhanced_dapplooker.log')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_ROTATION = os.getenv('LOG_ROTATION', 'size').lower()  # 'size' or 'time' (daily at midnight)
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', str(RETENTION_DAYS)))
+LOG_VERBOSITY = os.getenv('LOG_VERBOSITY', 'full').lower()  # 'full', 'sampled' or 'summary'
+LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', '10'))
+
+def setup_logging():
+    """
+    Send all log records through a queue to a background writer thread
+    - Callers only enqueue, file and console I/O never block the fetch path
+    - Log file rotates by size (LOG_MAX_BYTES) or daily (LOG_ROTATION=time)
+    """
+    if LOG_ROTATION == 'time':
+        file_handler = TimedRotatingFileHandler(LOG_FILE, when='midnight', backupCount=LOG_BACKUP_COUNT)
+    else:
+        file_handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+    stream_handler = logging.StreamHandler()
+    
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+    stream_handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(-1)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+    root_logger.addHandler(QueueHandler(log_queue))
+    
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # Drain the queue before the process exits
+    return listener
+
 # Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('enhanced_dapplooker.log'),
-        logging.StreamHandler()
-    ]
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
+class BatchLog:
+    """
+    Per-batch progress lines according to LOG_VERBOSITY
+    - full: every batch line is logged
+    - sampled: every LOG_SAMPLE_EVERY-th batch is logged, plus a per-chain summary
+    - summary: only the per-chain summary
+    Warnings and errors are always logged directly and are not affected
+    """
+    
+    def __init__(self, verbosity=LOG_VERBOSITY, sample_every=LOG_SAMPLE_EVERY):
+        self.verbosity = verbosity
+        self.sample_every = max(sample_every, 1)
+        self.showing = verbosity == 'full'
+        self.reset()
+    
+    def reset(self):
+        self.batches = 0
+        self.tokens = 0
+        self.records = 0
+        self.missing = 0
+        self.fallbacks = 0
+    
+    def start(self):
+        """Begin a batch and decide whether its lines are logged"""
+        self.batches += 1
+        if self.verbosity == 'sampled':
+            self.showing = (self.batches - 1) % self.sample_every == 0
+        else:
+            self.showing = self.verbosity == 'full'
+    
+    def step(self, message):
+        """Log a per-call progress line (classification, batch phase) - full mode only"""
+        if self.verbosity == 'full':
+            logger.info(message)
+    
+    def detail(self, message):
+        """Log a line belonging to the current batch"""
+        if self.showing:
+            logger.info(message)
+    
+    def done(self, message, tokens=0, records=0, missing=0, fallback=False):
+        """Record batch totals and log its result line"""
+        self.tokens += tokens
+        self.records += records
+        self.missing += missing
+        self.fallbacks += 1 if fallback else 0
+        self.detail(message)
+    
+    def summary(self, label):
+        """Log aggregated totals (sampled/summary modes) and start over"""
+        if self.verbosity != 'full' and self.batches:
+            logger.info(f"   📊 {label}: {self.batches} batches, {self.tokens} tokens, "
+                        f"{self.records} records added, {self.missing} missing, "
+                        f"{self.fallbacks} individual fallbacks")
+        self.reset()
+
+batch_log = BatchLog()
+
+class ResponseCache:
+    """
+    Opt-in on-disk cache of raw API responses
+    - on: reuse responses younger than CACHE_TTL_HOURS, store new successful ones
+    - replay: serve only from cache and ignore TTL - offline replay of a cached run
+    - Keyed by (endpoint, chain, page or sorted ticker set), api_key is never part of the key
+    - Entries are gzip-compressed JSON, least recently used are evicted above CACHE_MAX_MB
+    """
+    
+    def __init__(self, mode=CACHE_MODE, directory=CACHE_DIR, ttl_hours=CACHE_TTL_HOURS, max_mb=CACHE_MAX_MB):
+        self.mode = mode
+        self.directory = directory
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.size_bytes = None  # Scanned lazily on first store
+        self.last_from_cache = False
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+    
+    def key(self, url, params):
+        """Stable cache key for a request"""
+        key_params = {name: value for name, value in params.items() if name != 'api_key'}
+        if 'token_tickers' in key_params:
+            key_params['token_tickers'] = ','.join(sorted(set(key_params['token_tickers'].split(','))))
+        raw = json.dumps({'url': url.rstrip('/'), 'params': key_params}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+    
+    def get(self, url, params):
+        """Cached response body text, or None on miss/expiry"""
+        if self.mode == 'off':
+            return None
+        
+        path = self.path(self.key(url, params))
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        
+        if self.mode != 'replay' and time.time() - entry.get('fetched_at', 0) > self.ttl_seconds:
+            self.misses += 1
+            return None
+        
+        try:
+            os.utime(path)  # mtime doubles as last-used time for LRU eviction
+        except OSError:
+            pass  # Evicted by another shard worker after the read - the body is still good
+        self.hits += 1
+        return entry['body']
+    
+    def put(self, url, params, body):
+        """Store a successful response body, then evict if over the size limit"""
+        if self.mode != 'on':
+            return
+        
+        path = self.path(self.key(url, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            'fetched_at': time.time(),
+            'url': url,
+            'params': {name: value for name, value in params.items() if name != 'api_key'},
+            'body': body
+        }
+        
+        # Write then rename, so concurrent shard workers never read a half-written entry
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump(entry, f)
+            new_size = os.path.getsize(temp_path)
+            try:
+                old_size = os.path.getsize(path)  # Expired entry being overwritten
+            except OSError:
+                old_size = 0
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write cache entry {path}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass  # Never created (e.g. directory not writable)
+            return
+        
+        self.stores += 1
+        if self.size_bytes is None:
+            self.size_bytes = sum(size for _, size, _ in self.entries())
+        else:
+            self.size_bytes += new_size - old_size
+        if self.size_bytes > self.max_bytes:
+            self.evict()
+    
+    def entries(self):
+        """(mtime, size, path) for every cache entry"""
+        found = []
+        for path in glob.glob(os.path.join(self.directory, '*', '*.json.gz')):
+            try:
+                stat = os.stat(path)
+                found.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+        return found
+    
+    def evict(self):
+        """Remove least recently used entries until the cache is back to 90% of CACHE_MAX_MB"""
+        entries = sorted(self.entries())
+        self.size_bytes = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if self.size_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self.size_bytes -= size
+                removed += 1
+            except OSError:
+                continue
+        logger.info(f"   🧹 Response cache: evicted {removed} entries ({self.size_bytes / 1024 / 1024:.1f} MB left)")
+    
+    def log_stats(self):
+        if self.mode != 'off':
+            logger.info(f"💾 Response Cache ({self.mode}): {self.hits:,} hits, {self.misses:,} misses, {self.stores:,} stored")
+    
+    def replay_complete(self):
+        """False (logged as an error) if a replay had to skip requests that were not cached"""
+        if self.mode == 'replay' and self.misses:
+            logger.error(f"❌ Replay incomplete: {self.misses:,} cache misses - output is partial")
+            return False
+        return True
+
+response_cache = ResponseCache()
+
+def api_get(url, params, timeout):
+    """GET through the shared session, served from / stored in the response cache when enabled"""
+    body = response_cache.get(url, params)
+    if body is not None:
+        response_cache.last_from_cache = True
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = 'utf-8'
+        response._content = body.encode('utf-8')
+        return response
+    
+    if response_cache.mode == 'replay':
+        # Never touch the network while replaying - treat a miss like a failed request
+        response_cache.last_from_cache = True
+        raise requests.exceptions.ConnectionError(f"No cached response in replay mode for {url} {params.get('chain')}")
+    
+    response_cache.last_from_cache = False
+    response = SESSION.get(url, params=params, timeout=timeout)
+    if response.status_code == 200:
+        try:
+            if response.json().get('success'):
+                response_cache.put(url, params, response.text)
+        except ValueError:
+            pass  # Callers report invalid JSON themselves
+    return response
+
+def rate_limit(delay):
+    """Sleep between API calls - skipped when the last response came from the cache"""
+    if not response_cache.last_from_cache:
+        time.sleep(delay)
+
 def cleanup_old_files():
     """Remove files older than RETENTION_DAYS"""
     logger.info(f"🧹 Cleaning up files older than {RETENTION_DAYS} days...")
@@ -67,10 +369,21 @@ def cleanup_old_files():
             except Exception as e:
                 logger.error(f"   ❌ Error removing {file_path}: {e}")
     
+    # Clean up shard partials and markers
+    for file_path in glob.glob(os.path.join(SHARD_DIR, '*')):
+        try:
+            file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+            if file_time < cutoff_date:
+                os.remove(file_path)
+                logger.info(f"   🗑️  Removed old shard file: {file_path}")
+                removed_count += 1
+        except Exception as e:
+            logger.error(f"   ❌ Error removing {file_path}: {e}")
+    
     # Clean up log files
     for log_file in glob.glob('*.log'):
         try:
-            if log_file != 'enhanced_dapplooker.log':  # Keep current log
+            if log_file != LOG_FILE:  # Keep current log (size bounded by rotation)
                 file_time = datetime.fromtimestamp(os.path.getmtime(log_file))
                 if file_time < cutoff_date:
                     os.remove(log_file)
@@ -84,51 +397,54 @@ def cleanup_old_files():
     else:
         logger.info("   ✅ No old files to remove")
 
+# Market data CSV columns
+MARKET_FIELDNAMES = [
+    # Token Info
+    'id', 'symbol', 'name', 'chain', 'ecosystem', 'address',
+    # Market Data
+    'usd_price', 'mcap', 'fdv', 'volume_24h', 'total_liquidity',
+    'price_change_percentage_1h', 'price_change_percentage_24h',
+    'price_change_percentage_7d', 'price_change_percentage_30d',
+    'volume_change_percentage_7d', 'volume_change_percentage_30d',
+    'mcap_change_percentage_7d', 'mcap_change_percentage_30d',
+    'price_high_24h', 'price_ath', 'circulating_supply', 'total_supply',
+    # Technical Indicators
+    'support', 'resistance', 'rsi', 'sma',
+    # Token Holder Insights
+    'total_holder_count', 'holder_count_change_percentage_24h',
+    'fifty_percentage_holding_wallet_count',
+    'first_100_buyers_initial_bought',
+    'first_100_buyers_initial_bought_percentage',
+    'first_100_buyers_current_holding',
+    'first_100_buyers_current_holding_percentage',
+    'top_10_holder_balance', 'top_10_holder_percentage',
+    'top_50_holder_balance', 'top_50_holder_percentage',
+    'top_100_holder_balance', 'top_100_holder_percentage',
+    # Smart Money Insights
+    'top_25_holder_buy_24h', 'top_25_holder_sold_24h',
+    # Dev Wallet Insights
+    'wallet_address', 'wallet_balance',
+    'dev_wallet_total_holding_percentage',
+    'dev_wallet_outflow_txs_count_24h',
+    'dev_wallet_outflow_amount_24h',
+    'fresh_wallet', 'dev_sold', 'dev_sold_percentage',
+    'bundle_wallet_count', 'bundle_wallet_supply_percentage',
+    # Social Metrics
+    'mindshare_3d', 'mindshare_change_percentage_3d',
+    'impression_count_3d', 'impression_count_change_percentage_3d',
+    'engagement_count_3d', 'engagement_count_change_percentage_3d',
+    'follower_count_3d', 'smart_follower_count_3d',
+    'mindshare_7d', 'mindshare_change_percentage_7d',
+    'impression_count_7d', 'impression_count_change_percentage_7d',
+    'engagement_count_7d', 'engagement_count_change_percentage_7d',
+    'follower_count_7d', 'smart_follower_count_7d',
+    # Metadata
+    'last_updated_at'
+]
+
 def initialize_csv(filename):
     """Create CSV file with headers"""
-    fieldnames = [
-        # Token Info
-        'id', 'symbol', 'name', 'chain', 'ecosystem', 'address',
-        # Market Data
-        'usd_price', 'mcap', 'fdv', 'volume_24h', 'total_liquidity',
-        'price_change_percentage_1h', 'price_change_percentage_24h',
-        'price_change_percentage_7d', 'price_change_percentage_30d',
-        'volume_change_percentage_7d', 'volume_change_percentage_30d',
-        'mcap_change_percentage_7d', 'mcap_change_percentage_30d',
-        'price_high_24h', 'price_ath', 'circulating_supply', 'total_supply',
-        # Technical Indicators
-        'support', 'resistance', 'rsi', 'sma',
-        # Token Holder Insights
-        'total_holder_count', 'holder_count_change_percentage_24h',
-        'fifty_percentage_holding_wallet_count',
-        'first_100_buyers_initial_bought',
-        'first_100_buyers_initial_bought_percentage',
-        'first_100_buyers_current_holding',
-        'first_100_buyers_current_holding_percentage',
-        'top_10_holder_balance', 'top_10_holder_percentage',
-        'top_50_holder_balance', 'top_50_holder_percentage',
-        'top_100_holder_balance', 'top_100_holder_percentage',
-        # Smart Money Insights
-        'top_25_holder_buy_24h', 'top_25_holder_sold_24h',
-        # Dev Wallet Insights
-        'wallet_address', 'wallet_balance',
-        'dev_wallet_total_holding_percentage',
-        'dev_wallet_outflow_txs_count_24h',
-        'dev_wallet_outflow_amount_24h',
-        'fresh_wallet', 'dev_sold', 'dev_sold_percentage',
-        'bundle_wallet_count', 'bundle_wallet_supply_percentage',
-        # Social Metrics
-        'mindshare_3d', 'mindshare_change_percentage_3d',
-        'impression_count_3d', 'impression_count_change_percentage_3d',
-        'engagement_count_3d', 'engagement_count_change_percentage_3d',
-        'follower_count_3d', 'smart_follower_count_3d',
-        'mindshare_7d', 'mindshare_change_percentage_7d',
-        'impression_count_7d', 'impression_count_change_percentage_7d',
-        'engagement_count_7d', 'engagement_count_change_percentage_7d',
-        'follower_count_7d', 'smart_follower_count_7d',
-        # Metadata
-        'last_updated_at'
-    ]
+    fieldnames = list(MARKET_FIELDNAMES)
     
     with open(filename, 'w', newline='') as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -172,9 +488,18 @@ def get_all_tokens(chain):
     Returns list of token symbols
     100 tokens per page
     """
+    tokens, _ = fetch_token_catalog(chain)
+    return tokens
+
+def fetch_token_catalog(chain):
+    """
+    Page through crypto-metainfo for a chain
+    Returns (token symbols, complete) - complete is False when paging stopped on an error
+    """
     tokens = []
     page = 1
     total_tokens = 0
+    complete = False
     
     while True:
         params = {
@@ -184,7 +509,7 @@ def get_all_tokens(chain):
         }
         
         try:
-            response = requests.get(METAINFO_URL + "/", params=params, timeout=60)  # Add trailing slash
+            response = api_get(METAINFO_URL + "/", params=params, timeout=60)  # Add trailing slash
             response.raise_for_status()
             
             try:
@@ -202,6 +527,7 @@ def get_all_tokens(chain):
                 
             if not token_data:
                 logger.info("   ✅ No more tokens found")
+                complete = True
                 break
             
             # Extract token symbols
@@ -213,10 +539,11 @@ def get_all_tokens(chain):
             logger.info(f"   📄 Page {page}: {len(token_data)} tokens found (Total: {total_tokens})")
             
             if len(token_data) < 100:  # Less than max per page means we're done
+                complete = True
                 break
                 
             page += 1
-            time.sleep(0.2)  # Rate limiting
+            rate_limit(0.2)  # Rate limiting
             
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ Error fetching tokens page {page}: {str(e)}")
@@ -225,8 +552,11 @@ def get_all_tokens(chain):
             logger.error(f"❌ Unexpected error on page {page}: {str(e)}")
             break
     
-    logger.info(f"✅ STEP 1 Complete: Found {total_tokens} tokens")
-    return tokens
+    if complete:
+        logger.info(f"✅ STEP 1 Complete: Found {total_tokens} tokens")
+    else:
+        logger.warning(f"⚠️ STEP 1 Incomplete: token list for {chain} stopped at page {page} ({total_tokens} tokens)")
+    return tokens, complete
 
 def classify_tokens(token_symbols):
     """Classify tokens as clean or problematic based on special characters"""
@@ -242,6 +572,17 @@ def classify_tokens(token_symbols):
     
     return clean_tokens, problematic_tokens
 
+def shard_for(chain, symbol, shard_count):
+    """Stable shard index for a (chain, symbol) pair - identical on every machine"""
+    digest = hashlib.sha1(f"{chain}:{symbol}".encode('utf-8')).hexdigest()
+    return int(digest, 16) % shard_count
+
+def filter_shard_tokens(chain, token_symbols, shard_index, shard_count):
+    """Keep only the tokens owned by this shard"""
+    if shard_count <= 1:
+        return token_symbols
+    return [token for token in token_symbols if shard_for(chain, token, shard_count) == shard_index]
+
 def try_batch_request(chain, batch, batch_type=""):
     """Try to process a batch of tokens with 502 error retry logic"""
     token_tickers = ','.join(batch)
@@ -258,7 +599,7 @@ def try_batch_request(chain, batch, batch_type=""):
     
     for attempt in range(max_retries):
         try:
-            response = requests.get(MARKET_URL, params=params, timeout=60)
+            response = api_get(MARKET_URL, params=params, timeout=60)
             response.raise_for_status()
             
             try:
@@ -301,7 +642,7 @@ def try_individual_requests(chain, tokens, missing_tokens_filename):
     individual_data = []
     individual_processed = 0
     
-    logger.info(f"   🔄 Falling back to individual requests for {len(tokens)} tokens...")
+    batch_log.detail(f"   🔄 Falling back to individual requests for {len(tokens)} tokens...")
     
     for token in tokens:
         params = {
@@ -316,7 +657,7 @@ def try_individual_requests(chain, tokens, missing_tokens_filename):
         
         for attempt in range(max_retries):
             try:
-                response = requests.get(MARKET_URL, params=params, timeout=30)
+                response = api_get(MARKET_URL, params=params, timeout=30)
                 response.raise_for_status()
                 
                 try:
@@ -361,33 +702,39 @@ def try_individual_requests(chain, tokens, missing_tokens_filename):
                 log_missing_tokens([token], chain, missing_tokens_filename, f"Unexpected error: {str(e)}")
                 break
         
-        time.sleep(0.1)  # Small delay between individual requests
+        rate_limit(0.1)  # Small delay between individual requests
     
     return individual_data, individual_processed
 
-def get_market_data(chain, token_symbols, fieldnames, filename, existing_ids, missing_tokens_filename):
+def get_market_data(chain, token_symbols, fieldnames, filename, existing_ids, missing_tokens_filename,
+                    write_records=None, summarize=True):
     """
     Step 2: Get market data using crypto-market API with smart batching
     - Use normal batches for clean tokens
     - Use smaller batches for problematic tokens
     - Fall back to individual requests when batches fail
     - Only log to CSV after individual fallback fails
+    - write_records(market_data) replaces the CSV append when given (daemon snapshot)
+    - summarize=False leaves the batch_log summary to the caller (daemon passes span several calls)
     """
     total_processed = 0
+    if write_records is None:
+        write_records = lambda market_data: write_market_data(market_data, fieldnames, filename, existing_ids)
     
     # Classify tokens
     clean_tokens, problematic_tokens = classify_tokens(token_symbols)
     
-    logger.info(f"   📊 Token classification: {len(clean_tokens)} clean, {len(problematic_tokens)} problematic")
+    batch_log.step(f"   📊 Token classification: {len(clean_tokens)} clean, {len(problematic_tokens)} problematic")
     
     # Process clean tokens in normal batches (30 tokens)
     if clean_tokens:
-        logger.info(f"   🔄 Processing {len(clean_tokens)} clean tokens in normal batches...")
+        batch_log.step(f"   🔄 Processing {len(clean_tokens)} clean tokens in normal batches...")
         batch_size = 30
         
         for i in range(0, len(clean_tokens), batch_size):
             batch = clean_tokens[i:i+batch_size]
             batch_num = i//batch_size + 1
+            batch_log.start()
             
             success, market_data, error = try_batch_request(chain, batch, f"Clean batch {batch_num}: ")
             
@@ -406,31 +753,36 @@ def get_market_data(chain, token_symbols, fieldnames, filename, existing_ids, mi
                     log_missing_tokens(tokens_without_data, chain, missing_tokens_filename, "No market data returned")
                 
                 # Write to CSV
-                records_added = write_market_data(market_data, fieldnames, filename, existing_ids)
+                records_added = write_records(market_data)
                 total_processed += records_added
                 
                 missing_count = len(tokens_without_data)
-                logger.info(f"   ✅ Clean batch {batch_num}: Processed {len(batch)} tokens, added {records_added} records, {missing_count} missing")
+                batch_log.done(f"   ✅ Clean batch {batch_num}: Processed {len(batch)} tokens, added {records_added} records, {missing_count} missing",
+                               tokens=len(batch), records=records_added, missing=missing_count)
             else:
                 # Batch failed, fall back to individual requests
-                logger.info(f"   ⚠️ Clean batch {batch_num} failed, falling back to individual requests")
+                batch_log.detail(f"   ⚠️ Clean batch {batch_num} failed, falling back to individual requests")
                 individual_data, individual_count = try_individual_requests(chain, batch, missing_tokens_filename)
                 
+                records_added = 0
                 if individual_data:
-                    records_added = write_market_data(individual_data, fieldnames, filename, existing_ids)
+                    records_added = write_records(individual_data)
                     total_processed += records_added
-                    logger.info(f"   ✅ Individual fallback: Added {records_added} records from {individual_count} tokens")
+                batch_log.done(f"   ✅ Individual fallback: Added {records_added} records from {individual_count} tokens",
+                               tokens=len(batch), records=records_added,
+                               missing=len(batch) - individual_count, fallback=True)
             
-            time.sleep(0.2)  # Rate limiting
+            rate_limit(0.2)  # Rate limiting
     
     # Process problematic tokens in smaller batches (10 tokens)
     if problematic_tokens:
-        logger.info(f"   🔄 Processing {len(problematic_tokens)} problematic tokens in smaller batches...")
+        batch_log.step(f"   🔄 Processing {len(problematic_tokens)} problematic tokens in smaller batches...")
         batch_size = 10
         
         for i in range(0, len(problematic_tokens), batch_size):
             batch = problematic_tokens[i:i+batch_size]
             batch_num = i//batch_size + 1
+            batch_log.start()
             
             success, market_data, error = try_batch_request(chain, batch, f"Problematic batch {batch_num}: ")
             
@@ -449,25 +801,75 @@ def get_market_data(chain, token_symbols, fieldnames, filename, existing_ids, mi
                     log_missing_tokens(tokens_without_data, chain, missing_tokens_filename, "No market data returned")
                 
                 # Write to CSV
-                records_added = write_market_data(market_data, fieldnames, filename, existing_ids)
+                records_added = write_records(market_data)
                 total_processed += records_added
                 
                 missing_count = len(tokens_without_data)
-                logger.info(f"   ✅ Problematic batch {batch_num}: Processed {len(batch)} tokens, added {records_added} records, {missing_count} missing")
+                batch_log.done(f"   ✅ Problematic batch {batch_num}: Processed {len(batch)} tokens, added {records_added} records, {missing_count} missing",
+                               tokens=len(batch), records=records_added, missing=missing_count)
             else:
                 # Batch failed, fall back to individual requests
-                logger.info(f"   ⚠️ Problematic batch {batch_num} failed, falling back to individual requests")
+                batch_log.detail(f"   ⚠️ Problematic batch {batch_num} failed, falling back to individual requests")
                 individual_data, individual_count = try_individual_requests(chain, batch, missing_tokens_filename)
                 
+                records_added = 0
                 if individual_data:
-                    records_added = write_market_data(individual_data, fieldnames, filename, existing_ids)
+                    records_added = write_records(individual_data)
                     total_processed += records_added
-                    logger.info(f"   ✅ Individual fallback: Added {records_added} records from {individual_count} tokens")
+                batch_log.done(f"   ✅ Individual fallback: Added {records_added} records from {individual_count} tokens",
+                               tokens=len(batch), records=records_added,
+                               missing=len(batch) - individual_count, fallback=True)
             
-            time.sleep(0.2)  # Rate limiting
+            rate_limit(0.2)  # Rate limiting
     
+    if summarize:
+        batch_log.summary(f"{chain.upper()} market data")
     return total_processed
 
+def flatten_market_record(record):
+    """Flatten one nested crypto-market record into a CSV row"""
+    flat_record = {}
+    
+    # Token Info
+    token_info = record.get('token_info', {})
+    for key in ['id', 'symbol', 'name', 'chain', 'ecosystem', 'address']:
+        flat_record[key] = token_info.get(key)
+    
+    # Technical Indicators
+    tech_indicators = record.get('technical_indicators', {})
+    for key in ['support', 'resistance', 'rsi', 'sma']:
+        flat_record[key] = tech_indicators.get(key)
+    
+    # Token Holder Insights
+    holder_insights = record.get('token_holder_insights', {})
+    for key in holder_insights:
+        flat_record[key] = holder_insights.get(key)
+    
+    # Smart Money Insights
+    smart_money = record.get('smart_money_insights', {})
+    for key in smart_money:
+        flat_record[key] = smart_money.get(key)
+    
+    # Dev Wallet Insights
+    dev_wallet = record.get('dev_wallet_insights', {})
+    for key in dev_wallet:
+        flat_record[key] = dev_wallet.get(key)
+    
+    # Token Metrics
+    metrics = record.get('token_metrics', {})
+    for key in metrics:
+        flat_record[key] = metrics.get(key)
+    
+    # Social Metrics
+    social = record.get('x_social_metrics', {})
+    for key in social:
+        flat_record[key] = social.get(key)
+    
+    # Metadata
+    flat_record['last_updated_at'] = record.get('last_updated_at')
+    
+    return flat_record
+
 def write_market_data(market_data, fieldnames, filename, existing_ids):
     """Write market data to CSV file"""
     records_added = 0
@@ -476,54 +878,13 @@ def write_market_data(market_data, fieldnames, filename, existing_ids):
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         
         for record in market_data:
-            # Flatten nested data
-            flat_record = {}
-            
-            # Token Info
-            token_info = record.get('token_info', {})
-            for key in ['id', 'symbol', 'name', 'chain', 'ecosystem', 'address']:
-                flat_record[key] = token_info.get(key)
-            
-            # Technical Indicators
-            tech_indicators = record.get('technical_indicators', {})
-            for key in ['support', 'resistance', 'rsi', 'sma']:
-                flat_record[key] = tech_indicators.get(key)
-            
-            # Token Holder Insights
-            holder_insights = record.get('token_holder_insights', {})
-            for key in holder_insights:
-                flat_record[key] = holder_insights.get(key)
-            
-            # Smart Money Insights
-            smart_money = record.get('smart_money_insights', {})
-            for key in smart_money:
-                flat_record[key] = smart_money.get(key)
-            
-            # Dev Wallet Insights
-            dev_wallet = record.get('dev_wallet_insights', {})
-            for key in dev_wallet:
-                flat_record[key] = dev_wallet.get(key)
-            
-            # Token Metrics
-            metrics = record.get('token_metrics', {})
-            for key in metrics:
-                flat_record[key] = metrics.get(key)
-            
-            # Social Metrics
-            social = record.get('x_social_metrics', {})
-            for key in social:
-                flat_record[key] = social.get(key)
-            
-            # Metadata
-            flat_record['last_updated_at'] = record.get('last_updated_at')
-            
             # Write record
-            writer.writerow(flat_record)
+            writer.writerow(flatten_market_record(record))
             records_added += 1
     
     if records_added > 0:
         file_size = os.path.getsize(filename)
-        logger.info(f"   ✅ Added {records_added} records (Size: {file_size:,} bytes)")
+        batch_log.detail(f"   ✅ Added {records_added} records (Size: {file_size:,} bytes)")
     
     return records_added
 
@@ -572,10 +933,9 @@ def upload_to_irys(csv_file_path):
             # Enhanced transaction ID extraction with multiple patterns
             tx_id = None
             
-            # Log the raw output for debugging
-            logger.info(f"📄 Raw Irys output ({len(output)} chars):")
-            for i, line in enumerate(output.split('\n')):
-                logger.info(f"   Line {i}: '{line}'")
+            # Log the raw output for debugging (line by line only with LOG_LEVEL=DEBUG)
+            logger.info(f"📄 Raw Irys output ({len(output)} chars)")
+            logger.debug("Raw Irys output:\n" + output)
             
             # Pattern 1: Standard format
             for line in output.split('\n'):
@@ -637,63 +997,680 @@ def upload_to_irys(csv_file_path):
         logger.error(f"❌ Upload error: {e}")
         return None
 
-def process_chain(chain, fieldnames, filename, existing_ids, missing_tokens_filename):
-    """Process all tokens for a chain"""
+def shard_paths(run_id, shard_index, shard_count):
+    """Partial market data, missing tokens and completion marker paths for one shard"""
+    suffix = f"{run_id}_shard{shard_index:03d}of{shard_count:03d}"
+    return (
+        os.path.join(SHARD_DIR, f"market_data_{suffix}.csv"),
+        os.path.join(SHARD_DIR, f"missing_tokens_{suffix}.csv"),
+        os.path.join(SHARD_DIR, f"{suffix}.done")
+    )
+
+def shard_catalog_path(run_id):
+    """Token catalog the --workers coordinator fetches once and shares with its workers"""
+    return os.path.join(SHARD_DIR, f"catalog_{run_id}.json")
+
+def catalog_hash(tokens):
+    """Order-independent fingerprint of a token list - equal on every shard that saw the same catalog"""
+    return hashlib.sha1('\n'.join(sorted(set(tokens))).encode('utf-8')).hexdigest()
+
+def write_json_atomic(path, data):
+    """Write JSON through a temp file so readers never see a half-written file"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+def find_shard_counts(run_id):
+    """Shard counts found among the partial files written for a run"""
+    counts = set()
+    for path in glob.glob(os.path.join(SHARD_DIR, f"market_data_{run_id}_shard*of*.csv")):
+        match = re.search(r'_shard(\d+)of(\d+)\.csv$', path)
+        if match:
+            counts.add(int(match.group(2)))
+    return counts
+
+def merge_key(row):
+    """Dedupe key for a market data row - token ID, falling back to address/symbol"""
+    return (row.get('chain') or '', row.get('id') or row.get('address') or row.get('symbol') or '')
+
+def sort_market_rows(rows):
+    """Deterministic output order - chain (CHAINS order), then symbol, then ID"""
+    chain_order = {chain: index for index, chain in enumerate(CHAINS)}
+    def sort_key(row):
+        chain = row.get('chain') or ''
+        return (chain_order.get(chain, len(CHAINS)), chain, (row.get('symbol') or '').lower(), row.get('id') or '')
+    return sorted(rows, key=sort_key)
+
+def read_missing_tokens(missing_files):
+    """Missing token rows keyed by (chain, symbol), first occurrence wins"""
+    missing = {}
+    for missing_file in missing_files:
+        if not os.path.exists(missing_file):
+            continue
+        with open(missing_file, 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                key = (row.get('chain') or '', row.get('symbol') or '')
+                if key not in missing:
+                    missing[key] = row
+    return missing
+
+def merge_missing_tokens(missing_files, found, filename):
+    """
+    Combine missing token CSVs into one file
+    - Tokens in found (chain, symbol) set are dropped
+    - Deduplicated by (chain, symbol), first occurrence wins
+    Returns number of missing tokens written
+    """
+    return write_missing_tokens(read_missing_tokens(missing_files), found, filename)
+
+def write_missing_tokens(missing, found, filename):
+    """Write missing token rows sorted by chain and symbol, skipping found keys"""
+    missing = {key: row for key, row in missing.items() if key not in found}
+    chain_order = {chain: index for index, chain in enumerate(CHAINS)}
+    fieldnames = initialize_missing_tokens_csv(filename)
+    with open(filename, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        for key in sorted(missing, key=lambda k: (chain_order.get(k[0], len(CHAINS)), k[0], k[1])):
+            writer.writerow(missing[key])
+    
+    return len(missing)
+
+def check_shard_catalogs(done_markers):
+    """
+    Compare per-chain catalogs recorded in shard markers
+    Returns ["<shard>:<chain> (reason)", ...] for shards whose token list was empty,
+    stopped on an error, or differs from the list the other shards saw - a token that
+    moved between pages while shards paged separately may be owned by nobody
+    """
+    catalogs = {}
+    for index, done_marker in enumerate(done_markers):
+        if not os.path.exists(done_marker):
+            continue
+        try:
+            with open(done_marker, 'r') as f:
+                catalogs[index] = json.load(f).get('catalog', {})
+        except (OSError, ValueError, AttributeError):
+            catalogs[index] = {}
+    
+    # Most common fingerprint per chain is taken as the reference list
+    reference = {}
+    for chain in CHAINS:
+        hashes = [catalog.get(chain, {}).get('hash') for catalog in catalogs.values()]
+        hashes = [value for value in hashes if value]
+        reference[chain] = max(sorted(set(hashes)), key=hashes.count) if hashes else None
+    
+    incomplete = []
+    for index, catalog in sorted(catalogs.items()):
+        for chain in CHAINS:
+            info = catalog.get(chain)
+            if not info:
+                incomplete.append(f"{index}:{chain} (not recorded)")
+            elif not info.get('tokens'):
+                incomplete.append(f"{index}:{chain} (no tokens)")
+            elif not info.get('complete'):
+                incomplete.append(f"{index}:{chain} (stopped after {info['tokens']} tokens)")
+            elif info.get('hash') != reference[chain]:
+                incomplete.append(f"{index}:{chain} (token list of {info['tokens']} differs from other shards)")
+    return incomplete
+
+def merge_shards(run_id, allow_partial=False):
+    """
+    Merge shard partials into market_data_<run_id>.csv and missing_tokens_<run_id>.csv
+    - Rows are deduplicated by token ID (latest last_updated_at wins)
+    - Output is sorted by chain (CHAINS order), symbol and ID so reruns are byte-identical
+    Returns (filename, missing_tokens_filename, total_records) or None on failure
+    """
+    logger.info(f"\n🧩 MERGING SHARDS FOR RUN {run_id}")
+    logger.info("-" * 60)
+    
+    counts = find_shard_counts(run_id)
+    if len(counts) != 1:
+        logger.error(f"❌ Expected shard files for exactly one shard count in {SHARD_DIR}/, found: {sorted(counts) or 'none'}")
+        return None
+    shard_count = counts.pop()
+    shards = [shard_paths(run_id, index, shard_count) for index in range(shard_count)]
+    
+    unfinished = [index for index, (_, _, done_marker) in enumerate(shards) if not os.path.exists(done_marker)]
+    if unfinished:
+        if not allow_partial:
+            logger.error(f"❌ {len(unfinished)} of {shard_count} shards not finished: {unfinished}")
+            return None
+        logger.warning(f"⚠️ Merging without {len(unfinished)} unfinished shards: {unfinished}")
+    
+    # Every shard must have split the same full catalog, otherwise some tokens have no owner
+    incomplete = check_shard_catalogs([done_marker for _, _, done_marker in shards])
+    if incomplete:
+        if not allow_partial:
+            logger.error(f"❌ {len(incomplete)} shards have incomplete token lists: {incomplete}")
+            return None
+        logger.warning(f"⚠️ Merging shards with incomplete token lists: {incomplete}")
+    
+    # Market data - dedupe across shards
+    rows = {}
+    rows_read = 0
+    for market_file, _, _ in shards:
+        if not os.path.exists(market_file):
+            continue
+        with open(market_file, 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                rows_read += 1
+                key = merge_key(row)
+                current = rows.get(key)
+                if current is None or (row.get('last_updated_at') or '') > (current.get('last_updated_at') or ''):
+                    rows[key] = row
+    
+    filename = f"market_data_{run_id}.csv"
+    fieldnames = initialize_csv(filename)
+    with open(filename, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        for row in sort_market_rows(rows.values()):
+            writer.writerow(row)
+    
+    logger.info(f"   ✅ Merged {rows_read} rows from {shard_count} shards into {len(rows)} records ({rows_read - len(rows)} duplicates dropped)")
+    
+    # Missing tokens - drop symbols another shard did find, dedupe by (chain, symbol)
+    found = {(row.get('chain') or '', (row.get('symbol') or '').lower()) for row in rows.values()}
+    missing_tokens_filename = f"missing_tokens_{run_id}.csv"
+    missing_count = merge_missing_tokens([missing_file for _, missing_file, _ in shards], found, missing_tokens_filename)
+    
+    logger.info(f"   ✅ Merged {missing_count} missing tokens")
+    return filename, missing_tokens_filename, len(rows)
+
+def run_shard_worker(shard_index, shard_count, run_id, catalog_file=None):
+    """
+    Fetch this shard's slice of every chain into SHARD_DIR; merging and upload happen elsewhere
+    catalog_file is the coordinator's shared token catalog; without it the worker pages the catalog itself
+    """
+    logger.info(f"🧩 Shard worker {shard_index + 1}/{shard_count} started (run {run_id})")
+    logger.info("=" * 70)
+    
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    filename, missing_tokens_filename, done_marker = shard_paths(run_id, shard_index, shard_count)
+    
+    # A retry must not leave the previous attempt's marker vouching for a new partial
+    if os.path.exists(done_marker):
+        os.remove(done_marker)
+    
+    shared_catalog = None
+    if catalog_file:
+        with open(catalog_file, 'r') as f:
+            shared_catalog = json.load(f)
+    
+    fieldnames = initialize_csv(filename)
+    initialize_missing_tokens_csv(missing_tokens_filename)
+    
+    existing_ids = set()
+    total_records = 0
+    catalog = {}
+    for chain in CHAINS:
+        total_records += process_chain(chain, fieldnames, filename, existing_ids, missing_tokens_filename,
+                                       shard_index, shard_count, catalog, shared_catalog)
+    
+    response_cache.log_stats()
+    if not response_cache.replay_complete():
+        return 1  # No marker - the merge treats this shard as unfinished
+    
+    # Marker tells the merge stage this shard finished, and which token lists it split - written last
+    write_json_atomic(done_marker, {'records': total_records, 'catalog': catalog})
+    
+    logger.info(f"✅ Shard {shard_index + 1}/{shard_count} complete: {total_records:,} records in {filename}")
+    return 0
+
+def run_local_workers(worker_count, run_id):
+    """Fetch the token catalog once, run one shard worker process per shard on this machine and wait for all of them"""
+    logger.info(f"🧩 Starting {worker_count} local shard workers (run {run_id})")
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    
+    # One catalog for all workers, so every token has exactly one owner
+    shared_catalog = {}
+    for chain in CHAINS:
+        logger.info(f"📋 Getting all tokens for {chain.upper()} (shared by all workers)")
+        tokens, complete = fetch_token_catalog(chain)
+        if not tokens or not complete:
+            logger.error(f"❌ Token list for {chain} is empty or incomplete - not starting workers")
+            return False
+        shared_catalog[chain] = {'tokens': tokens, 'complete': complete}
+    catalog_file = shard_catalog_path(run_id)
+    write_json_atomic(catalog_file, shared_catalog)
+    
+    env = dict(os.environ)
+    env.pop('SHARD_WORKERS', None)  # Workers must not spawn workers
+    env['CACHE_MODE'] = response_cache.mode
+    
+    processes = []
+    for shard_index in range(worker_count):
+        # Separate log per worker - rotating one file from several processes is unsafe
+        env['LOG_FILE'] = os.path.join(SHARD_DIR, f"{run_id}_shard{shard_index:03d}of{worker_count:03d}.log")
+        cmd = [
+            sys.executable, os.path.abspath(__file__),
+            '--shard-index', str(shard_index),
+            '--shard-count', str(worker_count),
+            '--run-id', run_id,
+            '--catalog-file', catalog_file
+        ]
+        processes.append(subprocess.Popen(cmd, env=dict(env)))
+    
+    failed = [shard_index for shard_index, process in enumerate(processes) if process.wait() != 0]
+    if failed:
+        logger.error(f"❌ Shard workers failed: {failed}")
+        return False
+    
+    logger.info(f"✅ All {worker_count} shard workers finished")
+    return True
+
+def process_chain(chain, fieldnames, filename, existing_ids, missing_tokens_filename,
+                  shard_index=0, shard_count=1, catalog=None, shared_catalog=None):
+    """
+    Process all tokens for a chain (or only this shard's slice of them)
+    - shared_catalog, when given, supplies the token list instead of paging crypto-metainfo
+    - catalog, when given, receives {chain: {'tokens': count, 'complete': bool, 'hash': ...}}
+      for the full token list
+    """
     logger.info(f"\n🔄 PROCESSING: {chain.upper()}")
     logger.info("-" * 60)
     
     # Step 1: Get all tokens
-    logger.info(f"📋 STEP 1: Getting all tokens for {chain.upper()}")
-    tokens = get_all_tokens(chain)
+    if shared_catalog is not None:
+        entry = shared_catalog.get(chain, {})
+        tokens, complete = entry.get('tokens', []), entry.get('complete', False)
+        logger.info(f"📋 STEP 1: Using shared token list for {chain.upper()} ({len(tokens)} tokens)")
+    else:
+        logger.info(f"📋 STEP 1: Getting all tokens for {chain.upper()}")
+        tokens, complete = fetch_token_catalog(chain)
+    if catalog is not None:
+        catalog[chain] = {'tokens': len(tokens), 'complete': complete, 'hash': catalog_hash(tokens)}
     
     if not tokens:
         logger.warning(f"⚠️ No tokens found for {chain}")
         return 0
     
+    if shard_count > 1:
+        total_tokens = len(tokens)
+        tokens = filter_shard_tokens(chain, tokens, shard_index, shard_count)
+        logger.info(f"🧩 Shard {shard_index + 1}/{shard_count}: {len(tokens)} of {total_tokens} tokens assigned")
+        if not tokens:
+            return 0
+    
     # Step 2: Get market data for tokens
     logger.info(f"\n📊 STEP 2: Getting market data for {len(tokens)} tokens")
     total_processed = get_market_data(chain, tokens, fieldnames, filename, existing_ids, missing_tokens_filename)
     
     return total_processed
 
-def main():
-    """Main execution - Two-step process using both APIs"""
-    start_time = datetime.now()
+def to_float(value):
+    """Parse a CSV numeric cell, treating blanks and junk as 0"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+class RefreshDaemon:
+    """
+    Long-running refresh loop with tiered scheduling
+    - Token catalog and latest market rows are kept in memory between cycles
+    - hot: top tokens by volume_24h/mcap, every DAEMON_HOT_MINUTES
+    - warm: next tokens, every DAEMON_WARM_MINUTES
+    - cold: the long tail, tokens without market data and unranked tokens, every DAEMON_COLD_MINUTES
+    - Tier sizes are derived from DAEMON_REQUEST_BUDGET (default: the cost of one daily run)
+    - Warm/cold passes run in slices so hot refreshes stay on time
+    - The snapshot is rewritten in place (market_data_daemon.csv) every DAEMON_SNAPSHOT_MINUTES;
+      a timestamped market_data_*.csv is only created when uploading (every DAEMON_UPLOAD_MINUTES)
+    - SIGTERM/SIGINT stop the loop and write a final snapshot
+    """
     
-    logger.info("🚀 Enhanced DappLooker Two-Step API Fetcher Started")
-    logger.info("📋 Step 1: Get All Tokens (crypto-metainfo)")
-    logger.info("📊 Step 2: Get Market Data (crypto-market)")
-    logger.info(f"📅 Date: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info("=" * 70)
+    TIERS = ('hot', 'warm', 'cold')
     
-    # Cleanup old files first
-    cleanup_old_files()
+    SNAPSHOT_FILENAME = "market_data_daemon.csv"
+    MISSING_FILENAME = "missing_tokens_daemon.csv"
     
-    # Create CSV file with date/time stamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"market_data_{timestamp}.csv"
-    fieldnames = initialize_csv(filename)
+    def __init__(self, replay_upload=False):
+        self.fieldnames = list(MARKET_FIELDNAMES)
+        self.catalog = {}      # chain -> [symbols]
+        self.snapshot = {}     # merge_key -> flat market row
+        self.tiers = {}        # (chain, symbol) -> tier
+        self.missing = {}      # (chain, symbol) -> missing token row, kept until the token returns data
+        self.queue = []        # Pending warm/cold slices: (tier, chain, [symbols])
+        self.budget = 0
+        self.last_upload = time.time()
+        self.missing_tokens_filename = "missing_tokens_pending.csv"
+        self.stopping = False
+        self.replay_upload = replay_upload  # Publish snapshots even when replaying from cache
     
-    # Create missing tokens CSV file
-    missing_tokens_filename = f"missing_tokens_{timestamp}.csv"
-    initialize_missing_tokens_csv(missing_tokens_filename)
+    def load_snapshot(self):
+        """Seed the in-memory snapshot and missing tokens from the newest CSVs on disk"""
+        files = sorted(glob.glob('market_data_*.csv'), key=os.path.getmtime)
+        if not files:
+            logger.info("📂 No previous snapshot found - starting with a full pass")
+            return
+        
+        with open(files[-1], 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                self.snapshot[merge_key(row)] = row
+        logger.info(f"📂 Loaded {len(self.snapshot):,} records from {files[-1]}")
+        
+        missing_files = sorted(
+            (path for path in glob.glob('missing_tokens_*.csv') if path != self.missing_tokens_filename),
+            key=os.path.getmtime
+        )
+        if missing_files:
+            self.missing = read_missing_tokens(missing_files[-1:])
+            logger.info(f"📂 Loaded {len(self.missing):,} missing tokens from {missing_files[-1]}")
     
-    # Track existing IDs for duplicate prevention
-    existing_ids = set()
-    total_records = 0
+    def refresh_catalog(self):
+        """Re-read the token list of every chain, keeping the old list if a chain fails"""
+        logger.info("📋 Refreshing token catalog")
+        for chain in CHAINS:
+            tokens, complete = fetch_token_catalog(chain)
+            tokens = list(dict.fromkeys(tokens))  # Same symbol on several pages - fetch it once
+            previous = self.catalog.get(chain, [])
+            if not complete and len(tokens) < len(previous):
+                logger.warning(f"⚠️ Token list for {chain} incomplete - keeping previous catalog ({len(previous)} tokens)")
+                continue
+            
+            # Newly listed tokens get one fetch right away, then wait for ranking
+            if previous:
+                known = set(previous)
+                listed = [token for token in tokens if token not in known]
+                if listed:
+                    logger.info(f"   🆕 {len(listed)} new {chain} tokens queued")
+                    self.enqueue('new', {chain: listed})
+            self.catalog[chain] = tokens
+    
+    def default_budget(self):
+        """API requests of one daily run - one market pass plus one catalog pass"""
+        return sum(-(-len(tokens) // 30) + -(-len(tokens) // 100) for tokens in self.catalog.values())
+    
+    def estimate_requests(self):
+        """Requests/day for the current tiers: market batches per chain and tier, plus catalog pages"""
+        intervals = {'hot': DAEMON_HOT_MINUTES, 'warm': DAEMON_WARM_MINUTES, 'cold': DAEMON_COLD_MINUTES}
+        per_tier = {}
+        for tier in self.TIERS:
+            batches = sum(-(-len(self.tier_tokens(chain, tier)) // 30) for chain in CHAINS)
+            per_tier[tier] = batches * 1440 / intervals[tier]
+        catalog_pages = sum(-(-len(tokens) // 100) for tokens in self.catalog.values())
+        per_tier['catalog'] = catalog_pages * 1440 / DAEMON_CATALOG_MINUTES
+        return per_tier
+    
+    def rank_tokens(self):
+        """Snapshot (chain, symbol) keys ordered by volume_24h, then mcap"""
+        ranked_keys = []
+        seen = set()
+        for row in sorted(self.snapshot.values(),
+                          key=lambda row: (to_float(row.get('volume_24h')), to_float(row.get('mcap'))),
+                          reverse=True):
+            key = ((row.get('chain') or '').lower(), (row.get('symbol') or '').lower())
+            if key not in seen:
+                seen.add(key)
+                ranked_keys.append(key)
+        return ranked_keys
     
-    # Process Base chain
-    total_records += process_chain("base", fieldnames, filename, existing_ids, missing_tokens_filename)
+    def fill_tiers(self, ranked_keys):
+        """
+        Promote ranked tokens from cold to hot, then warm, while the daily cost fits the budget
+        - Costs are counted in whole per-chain batches, so a token is skipped when it would
+          open a batch the budget cannot pay for
+        - Hot may use DAEMON_HOT_SHARE of the budget left after catalog refreshes and the cold pass
+        """
+        rates = {'hot': 1440 / DAEMON_HOT_MINUTES, 'warm': 1440 / DAEMON_WARM_MINUTES, 'cold': 1440 / DAEMON_COLD_MINUTES}
+        counts = {(tier, chain): 0 for tier in self.TIERS for chain in CHAINS}
+        for chain in CHAINS:
+            counts[('cold', chain)] = len(self.catalog.get(chain, []))
+        
+        def cost():
+            return sum(-(-count // 30) * rates[tier] for (tier, _), count in counts.items())
+        
+        catalog_cost = sum(-(-len(tokens) // 100) for tokens in self.catalog.values()) * 1440 / DAEMON_CATALOG_MINUTES
+        baseline = catalog_cost + cost()
+        ceilings = {
+            'hot': baseline + max(self.budget - baseline, 0) * DAEMON_HOT_SHARE,
+            'warm': self.budget
+        }
+        
+        self.tiers = {}
+        in_catalog = {chain: set(tokens) for chain, tokens in self.catalog.items()}
+        for tier in ('hot', 'warm'):
+            for key in ranked_keys:
+                chain = key[0]
+                if key in self.tiers or key[1] not in in_catalog.get(chain, ()):
+                    continue
+                counts[('cold', chain)] -= 1
+                counts[(tier, chain)] += 1
+                if catalog_cost + cost() <= ceilings[tier]:
+                    self.tiers[key] = tier
+                else:
+                    counts[('cold', chain)] += 1
+                    counts[(tier, chain)] -= 1
+    
+    def assign_tiers(self, ranked_keys, hot_size, warm_size):
+        """Fixed tier sizes - top hot_size tokens hot, next warm_size warm"""
+        self.tiers = {}
+        for position, key in enumerate(ranked_keys):
+            if position < hot_size:
+                self.tiers[key] = 'hot'
+            elif position < hot_size + warm_size:
+                self.tiers[key] = 'warm'
+    
+    def compute_tiers(self):
+        """
+        Rank snapshot tokens by volume_24h, then mcap, and assign refresh tiers within the budget
+        Returns False when fixed DAEMON_HOT_SIZE/DAEMON_WARM_SIZE (or the cold pass alone) exceed the budget
+        """
+        self.budget = DAEMON_REQUEST_BUDGET or self.default_budget()
+        ranked_keys = self.rank_tokens()
+        
+        if DAEMON_HOT_SIZE is not None or DAEMON_WARM_SIZE is not None:
+            self.assign_tiers(ranked_keys, int(DAEMON_HOT_SIZE or 0), int(DAEMON_WARM_SIZE or 0))
+        else:
+            self.fill_tiers(ranked_keys)
+        
+        estimate = self.estimate_requests()
+        total = sum(estimate.values())
+        for tier in self.TIERS:
+            count = sum(len(self.tier_tokens(chain, tier)) for chain in CHAINS)
+            logger.info(f"   🎯 {tier}: {count:,} tokens (~{estimate[tier]:,.0f} requests/day)")
+        logger.info(f"   📋 catalog: ~{estimate['catalog']:,.0f} requests/day")
+        logger.info(f"   📈 Estimated requests/day: ~{total:,.0f} of {self.budget:,} budget")
+        
+        if total > self.budget:
+            logger.error(f"❌ Estimated requests/day exceed the budget ({self.budget:,}) - lower DAEMON_HOT_SIZE/"
+                         f"DAEMON_WARM_SIZE, raise DAEMON_COLD_MINUTES/DAEMON_CATALOG_MINUTES or DAEMON_REQUEST_BUDGET")
+            return False
+        return True
+    
+    def tier_tokens(self, chain, tier):
+        """Catalog tokens of a chain in a tier - unranked tokens count as cold"""
+        return [token for token in self.catalog.get(chain, []) if self.tiers.get((chain, token), 'cold') == tier]
+    
+    def update_snapshot(self, market_data):
+        """write_records hook for get_market_data - replaces rows in memory"""
+        for record in market_data:
+            row = flatten_market_record(record)
+            self.snapshot[merge_key(row)] = row
+        return len(market_data)
+    
+    def fetch(self, chain, tokens):
+        """Fetch market data for tokens of one chain into the in-memory snapshot"""
+        return get_market_data(chain, tokens, self.fieldnames, None, set(),
+                               self.missing_tokens_filename, write_records=self.update_snapshot,
+                               summarize=False)
     
-    # Process Solana chain
-    total_records += process_chain("solana", fieldnames, filename, existing_ids, missing_tokens_filename)
+    def refresh_hot(self):
+        """Fetch the hot tier right away - it is small enough to finish between slices"""
+        start_time = datetime.now()
+        total_records = 0
+        for chain in CHAINS:
+            tokens = self.tier_tokens(chain, 'hot')
+            if tokens:
+                total_records += self.fetch(chain, tokens)
+        if total_records:
+            batch_log.summary("Daemon hot pass")
+            logger.info(f"✅ Refresh hot: {total_records:,} records in {datetime.now() - start_time}")
     
+    def enqueue(self, tier, tokens_by_chain=None):
+        """Queue a warm/cold pass (or explicit tokens) as slices of DAEMON_SLICE_TOKENS"""
+        if tokens_by_chain is None:
+            if any(queued_tier == tier for queued_tier, _, _ in self.queue):
+                logger.warning(f"⚠️ Previous {tier} pass still running - skipping this one")
+                return
+            tokens_by_chain = {chain: self.tier_tokens(chain, tier) for chain in CHAINS}
+        
+        slices = 0
+        for chain, tokens in tokens_by_chain.items():
+            for i in range(0, len(tokens), DAEMON_SLICE_TOKENS):
+                self.queue.append((tier, chain, tokens[i:i + DAEMON_SLICE_TOKENS]))
+                slices += 1
+        if slices:
+            logger.info(f"\n🔄 DAEMON PASS QUEUED: {tier} ({slices} slices)")
+    
+    def work(self):
+        """Process queued slices for up to DAEMON_SLICE_SECONDS, then hand back to the scheduler"""
+        deadline = time.time() + DAEMON_SLICE_SECONDS
+        while self.queue and time.time() < deadline and not self.stopping:
+            tier, chain, tokens = self.queue.pop(0)
+            self.fetch(chain, tokens)
+            if not any(queued_tier == tier for queued_tier, _, _ in self.queue):
+                batch_log.summary(f"Daemon {tier} pass")
+                logger.info(f"✅ Daemon pass complete: {tier}")
+    
+    def write_snapshot(self, final=False):
+        """Rewrite the rolling snapshot and cumulative missing tokens, upload when due, then re-rank tiers"""
+        temp_path = f"{self.SNAPSHOT_FILENAME}.tmp"
+        with open(temp_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames)
+            writer.writeheader()
+            for row in sort_market_rows(self.snapshot.values()):
+                writer.writerow(row)
+        os.replace(temp_path, self.SNAPSHOT_FILENAME)
+        
+        # Missing tokens stay listed until they return data, not just until the next snapshot
+        found = {((row.get('chain') or '').lower(), (row.get('symbol') or '').lower()) for row in self.snapshot.values()}
+        self.missing.update(read_missing_tokens([self.missing_tokens_filename]))
+        self.missing = {key: row for key, row in self.missing.items() if key not in found}
+        write_missing_tokens(self.missing, found, self.MISSING_FILENAME)
+        initialize_missing_tokens_csv(self.missing_tokens_filename)
+        
+        logger.info(f"💾 Snapshot {self.SNAPSHOT_FILENAME}: {len(self.snapshot):,} records, {len(self.missing):,} missing tokens")
+        if final:
+            return
+        
+        upload_due = DAEMON_UPLOAD_MINUTES and time.time() - self.last_upload >= DAEMON_UPLOAD_MINUTES * 60
+        if upload_due and (response_cache.mode != 'replay' or (self.replay_upload and response_cache.replay_complete())):
+            # Only uploads get a timestamped copy - hourly snapshots overwrite the rolling file
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"market_data_{timestamp}.csv"
+            shutil.copyfile(self.SNAPSHOT_FILENAME, filename)
+            shutil.copyfile(self.MISSING_FILENAME, f"missing_tokens_{timestamp}.csv")
+            upload_to_irys(filename)
+            self.last_upload = time.time()
+        self.compute_tiers()
+    
+    def stop(self, signum, frame):
+        """Signal handler: finish the current slice, then leave the loop"""
+        logger.info(f"🛑 Received {signal.Signals(signum).name} - stopping after the current slice")
+        self.stopping = True
+    
+    def run_job(self, job, *args):
+        """Run a scheduled job without letting one failure stop the daemon"""
+        try:
+            job(*args)
+        except Exception as e:
+            logger.error(f"❌ Daemon job {job.__name__} failed: {e}")
+    
+    def run(self):
+        """Warm up, register tier jobs and run the schedule loop until stopped. Returns an exit code"""
+        logger.info("🛰️ Enhanced DappLooker Daemon Started")
+        logger.info("=" * 70)
+        
+        cleanup_old_files()
+        initialize_missing_tokens_csv(self.missing_tokens_filename)
+        
+        self.load_snapshot()
+        self.refresh_catalog()
+        if not self.compute_tiers():
+            return 1
+        if not self.snapshot:
+            # Everything is unranked (cold) - one full pass, the tiers follow from the first snapshot
+            self.enqueue('cold')
+        
+        schedule.every(DAEMON_HOT_MINUTES).minutes.do(self.run_job, self.refresh_hot)
+        schedule.every(DAEMON_WARM_MINUTES).minutes.do(self.run_job, self.enqueue, 'warm')
+        schedule.every(DAEMON_COLD_MINUTES).minutes.do(self.run_job, self.enqueue, 'cold')
+        schedule.every(DAEMON_CATALOG_MINUTES).minutes.do(self.run_job, self.refresh_catalog)
+        schedule.every(DAEMON_SNAPSHOT_MINUTES).minutes.do(self.run_job, self.write_snapshot)
+        schedule.every().day.do(self.run_job, cleanup_old_files)
+        
+        # Render stops workers with SIGTERM - keep the refreshed rows instead of dying mid-loop
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        
+        # Hot refreshes run from run_pending; warm/cold slices fill the time in between
+        while not self.stopping:
+            schedule.run_pending()
+            if self.queue:
+                self.run_job(self.work)
+            else:
+                time.sleep(1)
+        
+        if self.snapshot:
+            self.run_job(self.write_snapshot, True)
+        logger.info("🛑 Daemon stopped")
+        return 0
+
+def parse_args(argv=None):
+    """Command line options - every option can also be set through the environment"""
+    parser = argparse.ArgumentParser(description="Enhanced DappLooker Two-Step API Fetcher")
+    parser.add_argument('--shard-index', type=int, default=int(os.getenv('SHARD_INDEX', '0')),
+                        help="Shard handled by this worker, 0-based (env: SHARD_INDEX)")
+    parser.add_argument('--shard-count', type=int, default=int(os.getenv('SHARD_COUNT', '1')),
+                        help="Total shards the token universe is split into (env: SHARD_COUNT)")
+    parser.add_argument('--run-id', default=os.getenv('RUN_ID'),
+                        help="Run identifier shared by all shards of one run (env: RUN_ID, default: timestamp)")
+    parser.add_argument('--workers', type=int, default=int(os.getenv('SHARD_WORKERS', '1')),
+                        help="Run N local shard workers, then merge and upload (env: SHARD_WORKERS)")
+    parser.add_argument('--merge', metavar='RUN_ID',
+                        help="Only merge the shard outputs of RUN_ID, then upload")
+    parser.add_argument('--catalog-file',
+                        help="Token catalog shared by the --workers coordinator (set automatically)")
+    parser.add_argument('--allow-partial', action='store_true',
+                        help="Merge even if some shards did not finish")
+    parser.add_argument('--cache', choices=['off', 'on', 'replay'], default=CACHE_MODE,
+                        help="Response cache: on = reuse within CACHE_TTL_HOURS, replay = cache only, no network (env: CACHE_MODE)")
+    parser.add_argument('--replay-upload', action='store_true',
+                        default=os.getenv('CACHE_REPLAY_UPLOAD', 'false').lower() == 'true',
+                        help="Upload to Irys even with --cache replay (env: CACHE_REPLAY_UPLOAD)")
+    parser.add_argument('--daemon', action='store_true', default=os.getenv('DAEMON_MODE', 'false').lower() == 'true',
+                        help="Stay resident and refresh tokens in activity tiers (env: DAEMON_MODE)")
+    args = parser.parse_args(argv)
+    
+    # choices only checks command line values - CACHE_MODE from the environment arrives as the default
+    if args.cache not in ('off', 'on', 'replay'):
+        parser.error(f"invalid cache mode {args.cache!r} (CACHE_MODE must be off, on or replay)")
+    if args.shard_count < 1 or args.workers < 1:
+        parser.error("--shard-count and --workers must be at least 1")
+    if args.shard_count > 1 and args.workers > 1:
+        parser.error("--workers cannot be combined with --shard-count/SHARD_COUNT > 1 (workers set their own shard count)")
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index must be between 0 and --shard-count - 1")
+    return args
+
+def finish_run(start_time, total_records, filename, missing_tokens_filename, replay_upload=False):
+    """Upload the final market data file and log the run summary"""
     # Upload to Irys
     logger.info("\n📤 UPLOADING TO IRYS")
     logger.info("-" * 50)
-    tx_id = upload_to_irys(filename)
+    replay_complete = response_cache.replay_complete()
+    if response_cache.mode == 'replay' and not replay_upload:
+        # Replays are offline rebuilds of an already published run
+        logger.info("📤 Upload skipped in replay mode (use --replay-upload to publish)")
+        tx_id = None
+    elif not replay_complete:
+        logger.info("📤 Upload skipped - partial replay output is never published")
+        tx_id = None
+    else:
+        tx_id = upload_to_irys(filename)
     
-     # Final summary
+    # Final summary
     end_time = datetime.now()
     duration = end_time - start_time
     
@@ -710,6 +1687,7 @@ def main():
     logger.info(f"🔍 Missing Tokens File: {missing_tokens_filename}")
     logger.info(f"❌ Tokens Without Market Data: {missing_tokens_count:,}")
     logger.info(f"⏱️  Duration: {duration}")
+    response_cache.log_stats()
     
     if tx_id and tx_id != "success":
         logger.info("🎊 IRYS UPLOAD SUCCESSFUL!")
@@ -723,12 +1701,76 @@ def main():
         logger.info("⚠️  Upload failed or skipped")
     
     logger.info("=" * 70)
-    logger.info(f"📝 Log saved to: enhanced_dapplooker.log")
+    logger.info(f"📝 Log saved to: {LOG_FILE}")
     logger.info(f"🔍 Missing tokens tracked in: {missing_tokens_filename}")
     logger.info(f"🧹 Files older than {RETENTION_DAYS} days automatically cleaned")
     logger.info("🔄 Daily refresh ready - run again tomorrow for updates")
     
-    return 0
+    return 0 if replay_complete else 1
+
+def main(argv=None):
+    """Main execution - Two-step process using both APIs"""
+    args = parse_args(argv)
+    start_time = datetime.now()
+    timestamp = start_time.strftime('%Y%m%d_%H%M%S')
+    response_cache.mode = args.cache
+    
+    if args.daemon:
+        if response_cache.mode == 'on':
+            # Tier intervals are shorter than any useful TTL - cached data would defeat the refresh
+            logger.warning("⚠️ Response cache disabled in daemon mode (replay is still allowed)")
+            response_cache.mode = 'off'
+        try:
+            return RefreshDaemon(args.replay_upload).run()
+        except KeyboardInterrupt:
+            logger.info("🛑 Daemon stopped")
+            return 0
+    
+    # Shard worker: fetch a slice only, the coordinator/merge run uploads
+    if args.shard_count > 1 and not args.merge:
+        return run_shard_worker(args.shard_index, args.shard_count, args.run_id or timestamp, args.catalog_file)
+    
+    logger.info("🚀 Enhanced DappLooker Two-Step API Fetcher Started")
+    logger.info("📋 Step 1: Get All Tokens (crypto-metainfo)")
+    logger.info("📊 Step 2: Get Market Data (crypto-market)")
+    logger.info(f"📅 Date: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info("=" * 70)
+    
+    # Cleanup old files first
+    cleanup_old_files()
+    
+    if args.merge:
+        # Merge shards written by other runners
+        result = merge_shards(args.merge, args.allow_partial)
+        if not result:
+            return 1
+        filename, missing_tokens_filename, total_records = result
+    elif args.workers > 1:
+        # Fan out over local worker processes, then merge
+        run_id = args.run_id or timestamp
+        if not run_local_workers(args.workers, run_id) and not args.allow_partial:
+            return 1
+        result = merge_shards(run_id, args.allow_partial)
+        if not result:
+            return 1
+        filename, missing_tokens_filename, total_records = result
+    else:
+        # Create CSV file with date/time stamp
+        filename = f"market_data_{timestamp}.csv"
+        fieldnames = initialize_csv(filename)
+        
+        # Create missing tokens CSV file
+        missing_tokens_filename = f"missing_tokens_{timestamp}.csv"
+        initialize_missing_tokens_csv(missing_tokens_filename)
+        
+        # Track existing IDs for duplicate prevention
+        existing_ids = set()
+        total_records = 0
+        
+        for chain in CHAINS:
+            total_records += process_chain(chain, fieldnames, filename, existing_ids, missing_tokens_filename)
+    
+    return finish_run(start_time, total_records, filename, missing_tokens_filename, args.replay_upload)
 
 if __name__ == "__main__":
     exit_code = main()